@@ -9,6 +9,7 @@
 # Dave Hartburn May 2024
 
 import pygame,math
+from labelCache import LabelCache, formatValue
 
 # List of lengths
 polyLen=[1,1,1,1]
@@ -99,6 +100,7 @@ pygame.display.set_caption("Convex Polygon")
 # Init fonts
 pygame.font.init()
 labelFont = pygame.font.Font('freesansbold.ttf',28)
+labels = LabelCache()
 clock = pygame.time.Clock()
 mousePos = Point((0,0), False, (255,255,255),"Mouse")
 
@@ -130,9 +132,8 @@ def drawScreen():
         # Draw line to mouse
         mouseLine.draw(screen)
         # Add label
-        txt="{:.2f}°".format(mouseLine.angleD)
-        angLab = labelFont.render(txt, 1, (0,0,255))
-        screen.blit(angLab,(mousePos.coord[0]+30, mousePos.coord[1]+30))
+        txt=formatValue(mouseLine.angleD, 2, "°")
+        labels.blit(screen, txt, labelFont, (0,0,255), (mousePos.coord[0]+30, mousePos.coord[1]+30))
     elif(pointA!=None and pointB!=None):
         # Draw lines
         lineA.draw(screen)
@@ -145,9 +146,8 @@ def drawScreen():
         mouseLine.draw(screen)
         # Add label
         lineAngles=angleBetweenLines(lineA, mouseLine, True)
-        txt="{:.2f}°".format(lineAngles[1])
-        angLab = labelFont.render(txt, 1, (0,0,255))
-        screen.blit(angLab,(mousePos.coord[0]+30, mousePos.coord[1]+30))
+        txt=formatValue(lineAngles[1], 2, "°")
+        labels.blit(screen, txt, labelFont, (0,0,255), (mousePos.coord[0]+30, mousePos.coord[1]+30))
 
     pygame.display.flip()
 # End of draw screen
@@ -209,8 +209,7 @@ def drawStar():
         x=origin[0]+math.cos(math.radians(i))*l
         y=origin[1]+math.sin(math.radians(i))*l
         pygame.draw.line(screen,(0,255,0),origin,(x,y),3)
-        angLab = labelFont.render(str(i), 1, (0,0,255))
-        screen.blit(angLab,(x,y))
+        labels.blit(screen, str(i), labelFont, (0,0,255), (x,y))
 
 # End of draw star
     
@@ -3,17 +3,30 @@
 # Produce a convex polygon from a list of lengths, given in mm. It will scale
 # to the screen size.
 #
+# Several sets of lengths can be shown side by side, each as its own polygon
+# with its own scale. Only a polygon which has changed is redrawn.
+#
+# Points are kept in mm. The scale only affects how they are drawn, so the
+# shape and the exported sizes are the same whatever the size of the screen.
+#
 # Dave Hartburn May 2024
 
 import pygame,math
+from labelCache import LabelCache, formatValue
+from polyShapes import Polygon, Workspace, lengthCol, labelOffset
+from polyGeom import closureError, cyclicPolygon, fitScale
+import polyGeom
 
 # List of lengths
 #polyLen=[72,45,30]
 polyLen=[70.7,67.0,63.4,60.1,57.0,54.0,51.2,48.5,46.0,43.7,41.5,39.3,37.4,35.5,33.7,32.1,30.5,29.0,27.6]
+# Sets of lengths to show side by side, one polygon each
+polySets=[polyLen]
+#polySets=[polyLen,[72,45,30],[50,50,50,50]]
 
 autoSolve=0      # 0 - Plot points in a line
                  # 1 - Auto-drag last point to first. May result in concave shape
-                 # 2 - Try to solve by algorithm
+                 # 2 - Solve by algorithm, corners on a circle
 
 screenFactor=0.9        # Window will be size of first desktop x this factor
 # List of colours to display segments
@@ -29,157 +42,25 @@ pointRad=10         # Radius for all points
 marg=50             # Margin from origin, for initial point placement
 panStep=5           # How much to pan the screen by with cursor keys
 lineWidth=5         # How wide to draw lines
-
-# Lists of points and lines
-points=[]
-lines=[]
+showLabels=True     # Show segment lengths, angles and point labels. Toggle with l
+labelPlaces=1       # Decimal places for lengths and angles on labels
+rockSpeed=45        # Degrees per second to roll the polygon when rocking
+exportPlaces=2      # Decimal places of a mm for the OpenSCAD export. The auto
+                    # solver stops once it is this accurate
+sumMode="fsum"      # How to add up angles and lengths round the polygon when
+                    # solving (autoSolve 2), rocking and checking the export:
+                    # float, fsum (compensated), fraction or decimal (exact)
+groundCol=(128,64,0)
+
+# All of the polygons
+workspace=Workspace()
 
 activePoint = None
+activePoly = None   # Polygon the active point belongs to
 dragPoint = None    # Point which we are dragging the active point over
-
-# #################### Classes #################################
-class Point:
-    # Defines a point with a coordinate, colour and label
-    # Fixed is a boolean. If True, the point can not be moved when dragging a line
-    def __init__(self, coord, colour=(255,255,255), label="", fixed=False):
-        self.coord=coord
-        self.fixed=fixed
-        self.colour=colour
-        self.label=label
-        self.rad=pointRad
-        self.lines=[]       # A list of lines connected to this point
-        self.rect=None
-        self.locked=False
-        self.dragOver=False      # Flag if we are currently dragging the mouse over
-
-        #print("New point created ", self.coord)
-
-    def move(self, newcoord):
-        if not self.fixed and not self.locked:
-            self.coord=newcoord
-            # Mark this point as locked - it has moved. If we recurse through a loop
-            # we dont want the other points to pull this one
-            self.locked=True
-            # Do any attached lines have fixed line lengths?
-            for l in self.lines:
-                if l.fixLength:
-                    # This line should not shrink. Find the other point
-                    op=l.otherPoint(self)
-                    # Only move if it is not locked
-                    if op.locked == False:
-                        # Work out new coordinate. Find the direct angle to the other point
-                        # and pull/push it to the correct length along that line
-                        xdiff=op.coord[0]-self.coord[0]
-                        ydiff=op.coord[1]-self.coord[1]
-                        # Avoid division by zero
-                        if xdiff==0:
-                            xdiff=0.000001
-                        ang=math.atan2(ydiff, xdiff)
-                        #print(math.degrees(ang))
-                        # Calculate new x and y offsets
-                        xo=l.length*math.cos(ang)
-                        yo=l.length*math.sin(ang)
-                        # Move other point relative to self
-                        op.move((self.coord[0]+xo, self.coord[1]+yo))
-
-
-            # Done, unlock point
-            self.locked=False
-    # End of move
-
-    def forceMove(self,xoff,yoff):
-        # Forces a move of the point, ignoring all other restraints such as line length
-        # Moves my offset. Should only be used by pan function for a global move
-        nc=(self.coord[0]+xoff, self.coord[1]+yoff)
-        self.coord=nc
-
-    def draw(self, surface):
-        # Draw the point on a surface
-        self.rect=pygame.draw.circle(surface, self.colour, self.coord, self.rad)
-        # Are we being dragged over?
-        if self.dragOver:
-            pygame.draw.circle(surface, (255,0,255), self.coord, self.rad*2, 1)
-
-    def addLine(self,line):
-        self.lines.append(line)
-
-    def clicked(self, event):
-        if self.rect.collidepoint(event.pos):
-            return True
-        else:
-            return False
-
-    def setColour(self, col):
-        self.colour=col
-
-    def whatLines(self):
-        # Debugging function, lists lines connected to this point
-        i=0
-        for l in self.lines:
-            print("Line {}, length {}, fixLength {}".format(i,l.length, l.fixLength))
-            i+=1
-# End of class Point
-
-class LineSegment:
-    # Line segment joining two points A to B
-    def __init__(self, A, B, colour=(0,255,0), fixLength=False, w=1):
-        self.A=A
-        self.B=B
-        self.colour=colour
-        self.fixLength=fixLength    # If true, the line can not be stretched
-        self.width=w
-        self.angleR=0        # Holding values
-        self.angleD=0        # R = radians, D = degrees
-        self.length=0
-        self.recalc()
-        self.origLength=self.length
-
-        # Register self with the two points
-        A.addLine(self)
-        B.addLine(self)
-
-    def recalc(self):
-        # Recalculate both angle and length
-        xdiff=self.B.coord[0]-self.A.coord[0]
-        ydiff=self.B.coord[1]-self.A.coord[1]
-
-        # Calculate the angle described by the line A-B, relative to the positive x axis.
-        if(xdiff==0):
-            # Avoid division by zero
-            xdiff=0.000001
-        self.angleR=math.atan2(ydiff,xdiff)
-        if(self.angleR<0):
-            self.angleR=2*math.pi + self.angleR
-        self.angleD=math.degrees(self.angleR)
-
-        # Calculate length
-        self.length=math.sqrt(xdiff*xdiff+ydiff*ydiff)
-        #print("Length=", self.length)
-    # End of recalc
-
-    def getAngles(self):
-        # Return a tuple of radians, degrees
-        return (self.angleR, self.angleD)
-
-    def draw(self, surface):
-        pygame.draw.line(surface, self.colour, self.A.coord, self.B.coord, self.width)
-
-    def otherPoint(self, p):
-        # When we are dragging the end of a line, what is the other point to p?
-        if self.A==p:
-            return self.B
-        else:
-            return self.A
-
-    def replacePoint(self, P, N):
-        # Replace point P with point N
-        if self.A == P:
-            self.A=N
-        elif self.B == P:
-            self.B=N
-# End of class LineSegment
-
-
+rockProfile = None  # Set while rocking, see startRocking
+rockPoly = None     # Polygon being rocked, rockProfile belongs to it
+rockT = 0           # How far we have rocked, in faces
 
 # Pygame overhead
 pygame.init()
@@ -191,41 +72,98 @@ pygame.display.set_caption("Convex Polygon")
 # Init fonts
 pygame.font.init()
 labelFont = pygame.font.Font('freesansbold.ttf',28)
+smallFont = pygame.font.Font('freesansbold.ttf',14)
+labels = LabelCache()
 clock = pygame.time.Clock()
 
-# Work out scale. The longest length should fill 80% of the screen
-if(WIDTH<HEIGHT):
-    minScreen=WIDTH
-else:
-    minScreen=HEIGHT
-maxLength=0
-tLen=0      # Total length
-for l in polyLen:
-    tLen+=l
-    if l>maxLength:
-        maxLength=l
-print("Longest length is ", maxLength)
-scale=(minScreen*0.8)/maxLength
-print("80% scale method is scale of ", scale)
-# Assume a circle
-d=tLen/math.pi
-scale=(minScreen*0.8)/d
-print("Scale based on circumferance is ", scale)
+workspace.labels=labels
+workspace.font=smallFont
+workspace.places=labelPlaces
+workspace.showLabels=showLabels
+polyGeom.sumMode=sumMode
+
+# Lay polygons out in a grid, each in its own cell
+gridCols=math.ceil(math.sqrt(len(polySets)))
+gridRows=math.ceil(len(polySets)/gridCols)
+cellW=WIDTH/gridCols
+cellH=HEIGHT/gridRows
 # ********* Functions ************
 
+def polyScale(lengths, w, h, solve=0):
+    # Work out scale for one polygon in a cell of w x h.
+    tLen=0      # Total length
+    for l in lengths:
+        tLen+=l
+    if solve==0:
+        # Points start in a line, which must fit across the cell
+        return (w-2*marg)/tLen
+    # Assume a circle, its diameter should fill 80% of the cell
+    if(w<h):
+        minScreen=w
+    else:
+        minScreen=h
+    d=tLen/math.pi
+    return (minScreen*0.8)/d
+
 def drawScreen():
     # Update the display
     screen.fill(BG)
 
-    for l in lines:
-        l.draw(screen)
+    if rockProfile != None:
+        drawRocker()
+        pygame.display.flip()
+        return
 
-    for p in points:
-        p.draw(screen)
+    workspace.draw(screen)
 
     pygame.display.flip()
 # End of draw screen
 
+def startRocking():
+    # Build the rocking tables from the selected polygon
+    global rockProfile, rockPoly, rockT, activePoint
+    poly=workspace.selected
+    if poly == None or poly.walk() == None:
+        print("Join the points into a closed polygon before rocking")
+        return
+    try:
+        rockProfile=poly.rockerProfile()
+    except ValueError as e:
+        print("Can not rock this polygon: {}".format(e))
+        return
+    rockPoly=poly
+    rockT=0
+    if activePoint != None:
+        # Let go of any point being dragged, the shape is fixed while rocking
+        activePoint.setColour(pointCol)
+        activePoint=None
+    skipped=len(poly.points)-rockProfile.n
+    if skipped>0:
+        print("The polygon is not convex. It rocks on its convex hull, {} points never touch the ground".format(skipped))
+    m=rockProfile.metrics()
+    print("Rocking. Centroid height {:.2f} to {:.2f}mm, variance {:.4f}, maximum lift {:.2f}mm".format(
+        m["minHeight"], m["maxHeight"], m["heightVariance"], m["maxLift"]))
+# End of startRocking
+
+def drawRocker():
+    # Draw the polygon rolling along the ground. Everything comes from the
+    # rocking tables, the view follows the centroid
+    scale=rockPoly.scale
+    groundY=HEIGHT*0.8
+    cx,ch=rockProfile.centroidAt(rockT)
+    def toScreen(v):
+        return (WIDTH/2+(v[0]-cx)*scale, groundY-v[1]*scale)
+    pygame.draw.line(screen, groundCol, (0,groundY), (WIDTH,groundY), lineWidth)
+    verts=[toScreen(v) for v in rockProfile.vertsAt(rockT)]
+    n=len(verts)
+    for i in range(n):
+        pygame.draw.line(screen, rockProfile.cols[i], verts[i], verts[(i+1)%n], lineWidth)
+    c=toScreen((cx,ch))
+    pygame.draw.circle(screen, selectedCol, c, pointRad/2)
+    if workspace.showLabels:
+        labels.blit(screen, formatValue(ch, labelPlaces, "mm"), smallFont, lengthCol, (c[0]+labelOffset, c[1]))
+# End of drawRocker
+
 def calcLineAngle(A, B):
     # Calculate the angle described by the line A-B, relative to the positive x axis.
     # Return a tuple of radians, degrees
@@ -258,9 +196,6 @@ def angleBetweenLines(A, B, smallest):
         rtn=diff
     return rtn
 
-def plotConvexPolt():
-    global points
-
 def trianglePoint(A, B, l, i):
     # Calculates the third point of a triangle which is of line length l from point B at an angle of i to the line AB
 
@@ -278,22 +213,8 @@ def trianglePoint(A, B, l, i):
     return(Cx,Cy)
 # End of trianglePoint
 
-
-def mergePoints(A, B):
-    # Replace point B with point A
-    if A == None or B == None:
-        return
-    #print("Merging points")
-    for l in B.lines:
-        #print("  Found a line")
-        l.replacePoint(B, A)
-        A.lines.append(l)
-    # Destroy old point
-    points.remove(B)
-
 def pan(keys):
-    # Pan the screen, move all the points
-    global points
+    # Pan the screen, move all the polygons
     x=0
     y=0
     if keys[pygame.K_UP]:
@@ -304,17 +225,17 @@ def pan(keys):
         x=-panStep
     if keys[pygame.K_RIGHT]:
         x=panStep
-    for p in points:
-        p.forceMove(x,y)
+    workspace.pan(x,y)
 
-def openSCADexport():
+def openSCADexport(poly):
     print("Copy this into an openSCAD model. If you have not joined up your line to make a polygon, this will get messy!")
     polyStr="polygon( points = ["
     pcount=1
     #pathStr="paths [ ["
-    for p in points:
-        x=int(p.coord[0]/scale)
-        y=int(p.coord[1]/scale)
+    for p in poly.points:
+        # Already in mm, round rather than truncate
+        x=formatValue(p.coord[0], exportPlaces)
+        y=formatValue(p.coord[1], exportPlaces)
         if pcount>1:
             polyStr+=", [{},{}]".format(x,y)
             #pathStr+=",p{}".format(pcount)
@@ -325,81 +246,70 @@ def openSCADexport():
         pcount+=1
 
     print("linear_extrude(3) {",polyStr, "]);}")
+    walk=poly.walk()
+    if walk!=None:
+        lengths=[l.length for l in walk[1]]
+        verts=[p.coord for p in walk[0]]
+        err=closureError(lengths, verts)
+        print("Largest error in a side length is {:.2e}mm".format(err))
+        if err>poly.tol:
+            print("Warning: side lengths are out by more than the {:.2e}mm needed for {} decimal places".format(
+                poly.tol, exportPlaces))
 
 def debugFunction():
     # Ad-hoc debugging function
     print("*** Debug ****")
-    i=0
-    for i in range(len(lines)):
-        print("  Line {}, length {}".format(i, lines[i].length))
-        if lines[i].fixLength:
-            print("    This line is fixed")
+    for j in range(len(workspace.polygons)):
+        poly=workspace.polygons[j]
+        print("  Polygon {}, scale {}".format(j, poly.scale))
+        lines=poly.lines
+        for i in range(len(lines)):
+            print("    Line {}, length {}".format(i, lines[i].length))
+            if lines[i].fixLength:
+                print("      This line is fixed")
+    print("  Label cache entries {}, hits {}, misses {}".format(*labels.stats()))
     print("*** End of Debug ***")
 # ********* End of functions *****
 
 # Structures set up
-x=marg
-y=marg
-
-# Point placement
-if autoSolve==2:
-    # Attempt to solve with algorithm
-    np=len(polyLen)
-    if np<3:
-        print("You need at least 3 shapes to plot a shape")
-        autoSolve=0
-    elif np==3:
-        # Does this form a valid triangle?
-        longest=0
-        sum=0
-        for l in polyLen:
-            sum+=l
-            if l>longest:
-                longest=l
-        if (sum-longest)<longest:
-            print("This is not a valid triangle")
-            autoSolve=0
-    # Handled errors, continue or drop through
-    if autoSolve==2:
-        plotConvexPoly()
-
-if autoSolve<2:
-    # Plot in a line
-    # Place point at origin
-    p=Point((x,y), colour=pointCol)
-    points.append(p)
-    lastPoint=p
-    c=0     # Track colours
-
-    for i in range(len(polyLen)):
-        # Work out position for next point
-
-        x=x+polyLen[i]*scale
-
-        # Create new point
-        p=Point((x,y), colour=pointCol)
-        points.append(p)
-        # Draw point between this and last, if present
-        if lastPoint != None:
-            l=LineSegment(lastPoint, p, colour=COLS[c], fixLength=True, w=lineWidth)
-            lines.append(l)
-            c+=1
-            if c>len(COLS)-1:
-                c=0
-        lastPoint=p
-
-    # "Cheat" way to solve. Just move last point to first point, merge and see what happens
-    if autoSolve==1:
-        # Last point is still set from above
-        # This doesn't work well placing the last on the first with them all on a line
-        # move it to the lower middle of the screen
-        lastPoint.move((WIDTH/2, HEIGHT*0.6))
-        # If we move it directly to where the first point is, the first point is likely to move
-        # We need to loop
-        while points[0].coord!=lastPoint.coord:
-            lastPoint.move(points[0].coord)
-        mergePoints(lastPoint, points[0])
-# End of if autosolve 0,1
+for i in range(len(polySets)):
+    lengths=polySets[i]
+    cellX=(i%gridCols)*cellW
+    cellY=(i//gridCols)*cellH
+    cell=pygame.Rect(int(cellX), int(cellY), int(cellW), int(cellH))
+    solve=autoSolve
+
+    # Point placement
+    if solve==2:
+        # Solve by algorithm, the polygon with all its corners on a circle.
+        # It is worked out with y up, so flip it to y down like the screen
+        try:
+            verts=[(x,-y) for x,y in cyclicPolygon(lengths, exportPlaces)]
+        except ValueError as e:
+            print("Polygon {}: {}, plotting in a line instead".format(i, e))
+            solve=0
+        if solve==2:
+            scale,origin=fitScale(verts, (cellW, cellH), marg)
+            print("Polygon {} scale is {}".format(i, scale))
+            workspace.add(Polygon(lengths, scale, (cellX+origin[0], cellY+origin[1]), cols=COLS,
+                pCol=pointCol, rad=pointRad, w=lineWidth, verts=verts, places=exportPlaces, clip=cell))
+
+    if solve<2:
+        # Plot in a line
+        scale=polyScale(lengths, cellW, cellH, solve)
+        print("Polygon {} scale is {}".format(i, scale))
+        poly=workspace.add(Polygon(lengths, scale, (cellX+marg, cellY+marg), cols=COLS,
+            pCol=pointCol, rad=pointRad, w=lineWidth, places=exportPlaces, clip=cell))
+
+        # "Cheat" way to solve. Just move last point to first point, merge and see what happens
+        if solve==1:
+            # This doesn't work well placing the last on the first with them all on a line
+            # move it to the lower middle of the cell
+            gap=poly.autoClose(poly.toModel((cellX+cellW/2, cellY+cellH*0.6)))
+            if gap>poly.tol:
+                print("Warning: polygon {} did not close to {:.2e}mm, the last points were {:.2e}mm apart when merged".format(
+                    i, poly.tol, gap))
+    # End of if autosolve 0,1
 
 
 
@@ -413,13 +323,14 @@ while running:
     if event.type == pygame.QUIT:
         running = False
     elif event.type == pygame.MOUSEBUTTONDOWN:
-        if event.button == 1:
-            # Left click
-            for p in points:
-                if p.clicked(event):
-                    activePoint=p
-                    p.setColour(selectedCol)
-                    #p.whatLines()
+        if event.button == 1 and rockProfile == None:
+            # Left click, the polygons can not be edited while rocking
+            hit=workspace.pointAt(event)
+            if hit != None:
+                activePoly,activePoint=hit
+                workspace.selected=activePoly
+                activePoint.setColour(selectedCol)
+                #activePoint.whatLines()
     elif event.type == pygame.MOUSEBUTTONUP:
         if event.button == 1 and activePoint!=None:
             activePoint.setColour(pointCol)
@@ -427,34 +338,52 @@ while running:
     elif event.type == pygame.MOUSEMOTION:
         # We are dragging if there is an active point
         if activePoint != None:
-            activePoint.move(event.pos)
-            # Are we over another point?
+            activePoint.move(activePoly.toModel(event.pos))
+            # Are we over another point in the same polygon?
             dragPoint = None
-            for p in points:
+            for p in activePoly.points:
                 # Icnore active point
                 if p != activePoint:
                     if p.rect.collidepoint(event.pos):
-                        p.dragOver=True
+                        p.setDragOver(True)
                         dragPoint=p
                     else:
-                        p.dragOver=False
+                        p.setDragOver(False)
     elif event.type == pygame.KEYDOWN:
         if event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
             running=False
         elif event.key == pygame.K_m:
            # Merge points
-           mergePoints(activePoint, dragPoint)
+           if activePoly != None and rockProfile == None:
+               activePoly.mergePoints(activePoint, dragPoint)
         elif event.key == pygame.K_d:
             # Debug
             debugFunction()
         elif event.key == pygame.K_s:
-            openSCADexport()
+            openSCADexport(workspace.selected)
+        elif event.key == pygame.K_l:
+            workspace.showLabels = not workspace.showLabels
+            workspace.redrawAll()
+        elif event.key == pygame.K_r:
+            # Toggle rocking
+            if rockProfile == None:
+                startRocking()
+            else:
+                rockProfile=None
+                rockPoly=None
     #else:
     #    print(event)
     # Are cursor keys held down?
     keys=pygame.key.get_pressed()
     pan(keys)
 
+    if rockProfile != None and rockPoly.profile is not rockProfile:
+        # The shape has changed since the tables were made, stop rocking
+        rockProfile=None
+        rockPoly=None
+    if rockProfile != None:
+        rockT=rockProfile.advance(rockT, math.radians(rockSpeed)*clock.get_time()/1000)
+
     drawScreen()
     clock.tick(FPS)
 pygame.quit()
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+# labelCache.py - Cached text rendering for labels on the polygon tools.
+#
+# Rendering text with a pygame font rasterises the glyphs every time, which
+# is slow when every vertex and segment of a large polygon is labelled on
+# every frame. Rendered surfaces are kept in a least recently used cache
+# keyed by (text, font, colour), so an unchanged label only costs a blit.
+#
+# Values are quantized to the precision they are displayed at before being
+# turned into text. A length of 45.0001 and 45.0002 both become "45.0" and
+# share one cache entry, and -0.0 is folded into 0.0.
+
+from collections import OrderedDict
+
+labelCacheSize=512      # Default number of rendered labels to keep
+
+
+def quantize(value, places):
+    # Round a value to the number of decimal places it will be displayed at
+    q=round(value, places)
+    if q==0:
+        # Avoid "-0.0" and "0.0" being two different labels
+        q=0.0
+    return q
+
+def formatValue(value, places, suffix=""):
+    # Return a label string for a value shown to 'places' decimal places
+    return "{:.{}f}{}".format(quantize(value, places), places, suffix)
+
+
+# #################### Classes #################################
+class LabelCache:
+    # LRU cache of rendered text surfaces
+    def __init__(self, maxSize=labelCacheSize):
+        self.maxSize=maxSize
+        self.surfaces=OrderedDict()
+        self.hits=0
+        self.misses=0
+
+    def render(self, text, font, colour):
+        # Return a surface for the text, rendering it only if it is not cached
+        key=(text, font, tuple(colour))
+        surf=self.surfaces.get(key)
+        if surf is not None:
+            self.hits+=1
+            self.surfaces.move_to_end(key)
+            return surf
+        self.misses+=1
+        surf=font.render(text, 1, colour)
+        self.surfaces[key]=surf
+        if len(self.surfaces)>self.maxSize:
+            # Drop the least recently used label
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def blit(self, surface, text, font, colour, pos, centre=False):
+        # Draw a label on a surface. If centre is True, pos is the middle of
+        # the label rather than the top left corner
+        surf=self.render(text, font, colour)
+        if centre:
+            pos=(pos[0]-surf.get_width()/2, pos[1]-surf.get_height()/2)
+        return surface.blit(surf, pos)
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        # Debugging function, returns a tuple of entries, hits, misses
+        return (len(self.surfaces), self.hits, self.misses)
+# End of class LabelCache
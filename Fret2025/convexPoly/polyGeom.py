@@ -0,0 +1,237 @@
+#!/usr/bin/python
+
+# polyGeom.py - Plain geometry helpers for polygons given as a list of (x,y)
+# vertices. No pygame, so these can be used headless.
+#
+# Vertices are in model coordinates, in mm. Unless a function says
+# otherwise y points up, and a polygon listed anticlockwise has a positive
+# area.
+#
+# Long chains of sides add up many small rounding errors. Sums which matter
+# for closing a polygon go through accumulate(), which can use plain floats,
+# compensated summation (math.fsum), or exact sums of the float terms with
+# fractions.Fraction or decimal.Decimal.
+
+import math,itertools
+from fractions import Fraction
+from decimal import Decimal, localcontext
+
+sumMode="fsum"      # Default for accumulate: float, fsum, fraction or decimal
+decimalDigits=40    # Working precision for the decimal sum mode
+
+
+def accumulate(values, mode=None):
+    # Sum a list of floats using the given sum mode, returns a float
+    if mode == None:
+        mode=sumMode
+    if mode=="float":
+        return sum(values)
+    elif mode=="fsum":
+        return math.fsum(values)
+    elif mode=="fraction":
+        # Every float is an exact fraction, so this sum has no rounding at all
+        return float(fractionSums(values)[-1])
+    elif mode=="decimal":
+        with localcontext() as ctx:
+            ctx.prec=decimalDigits
+            return float(sum((Decimal(v) for v in values), Decimal(0)))
+    raise ValueError("Unknown sum mode {}".format(mode))
+
+def prefixSums(values, mode=None):
+    # Running totals, [0, v0, v0+v1, ...], using the same sum modes as
+    # accumulate. Totals are kept running rather than summed afresh for each
+    # prefix, so a long chain costs one pass
+    if mode == None:
+        mode=sumMode
+    if mode=="float":
+        return list(itertools.accumulate(values, initial=0.0))
+    elif mode=="fsum":
+        # Neumaier's compensated sum, keeping the lost low order bits in c
+        rtn=[0.0]
+        t=0.0
+        c=0.0
+        for v in values:
+            u=t+v
+            if abs(t)>=abs(v):
+                c+=(t-u)+v
+            else:
+                c+=(v-u)+t
+            t=u
+            rtn.append(t+c)
+        return rtn
+    elif mode=="fraction":
+        return [float(t) for t in fractionSums(values)]
+    elif mode=="decimal":
+        with localcontext() as ctx:
+            ctx.prec=decimalDigits
+            totals=itertools.accumulate((Decimal(v) for v in values), initial=Decimal(0))
+            return [float(t) for t in totals]
+    raise ValueError("Unknown sum mode {}".format(mode))
+
+def fractionSums(values):
+    # Exact running totals of floats as Fractions. Float denominators are all
+    # powers of two, so the numerators are put over the largest one and added
+    # as integers, which is much quicker than adding Fractions one by one
+    ratios=[float(v).as_integer_ratio() for v in values]
+    d=max([q for p,q in ratios]+[1])
+    totals=itertools.accumulate((p*(d//q) for p,q in ratios), initial=0)
+    return [Fraction(t, d) for t in totals]
+
+def precisionTol(places):
+    # Largest error in mm that can be left when results are shown to this
+    # many decimal places. A twentieth of the rounding step (a tenth of the
+    # most rounding can move a value), so it can not change a rounded digit
+    # except right on a rounding boundary
+    return 0.05*10**(-places)
+
+
+def polygonArea(verts):
+    # Signed area by the shoelace formula. Positive if anticlockwise
+    n=len(verts)
+    a=0
+    for i in range(n):
+        x0,y0=verts[i]
+        x1,y1=verts[(i+1)%n]
+        a+=x0*y1-x1*y0
+    return a/2
+
+def polygonCentroid(verts):
+    # Centroid of the area of the polygon (not the average of the vertices)
+    n=len(verts)
+    a=0
+    cx=0
+    cy=0
+    for i in range(n):
+        x0,y0=verts[i]
+        x1,y1=verts[(i+1)%n]
+        cross=x0*y1-x1*y0
+        a+=cross
+        cx+=(x0+x1)*cross
+        cy+=(y0+y1)*cross
+    a=a/2
+    return (cx/(6*a), cy/(6*a))
+
+def convexHull(verts):
+    # Indices of the vertices on the convex hull, anticlockwise, starting
+    # from the lowest index. Vertices inside the hull, or in line with their
+    # neighbours on it, are left out. Andrew's monotone chain
+    order=sorted(range(len(verts)), key=lambda i: verts[i])
+    def cross(o, a, b):
+        return (a[0]-o[0])*(b[1]-o[1])-(a[1]-o[1])*(b[0]-o[0])
+    def half(idx):
+        h=[]
+        for i in idx:
+            while len(h)>=2 and cross(verts[h[-2]], verts[h[-1]], verts[i])<=0:
+                h.pop()
+            h.append(i)
+        return h
+    lower=half(order)
+    upper=half(reversed(order))
+    hull=lower[:-1]+upper[:-1]
+    start=hull.index(min(hull))
+    return hull[start:]+hull[:start]
+
+def checkLengths(lengths):
+    # Raise ValueError if no polygon can be made from these lengths
+    if len(lengths)<3:
+        raise ValueError("You need at least 3 lengths to make a polygon")
+    longest=max(lengths)
+    if sum(lengths)-longest<=longest:
+        raise ValueError("Longest length {} is too long to close the polygon".format(longest))
+
+def cyclicPolygon(lengths, places=6, mode=None):
+    # Returns the vertices of the convex polygon with the given side lengths
+    # whose corners all lie on a circle. Side i runs from vertex i to vertex
+    # i+1, anticlockwise, starting with vertex 0 at the origin and side 0
+    # along the positive x axis.
+    #
+    # The circumradius R is found by bisection. Each side subtends a central
+    # angle of 2*asin(l/2R) and these must add up to a full turn. If the
+    # longest side is long enough the centre lies outside the polygon and
+    # the longest side subtends the reflex angle instead.
+    #
+    # Any angle left over opens a gap of about R times that angle where the
+    # polygon should close. The bisection stops as soon as that gap is below
+    # what can show at 'places' decimal places of a mm, so asking for less
+    # precision does less work. mode is the sum mode for accumulate.
+    checkLengths(lengths)
+    longest=max(lengths)
+    iLong=lengths.index(longest)
+
+    tol=precisionTol(places)
+
+    def centralAngles(R, outside):
+        angs=[]
+        for i,l in enumerate(lengths):
+            a=2*math.asin(min(1, l/(2*R)))
+            if outside and i==iLong:
+                a=2*math.pi-a
+            angs.append(a)
+        return angs
+
+    def turn(R, outside):
+        # Total central angle less a full turn. Positive while R is too small
+        t=accumulate(centralAngles(R, outside)+[-2*math.pi], mode)
+        if outside:
+            # Here the total grows with R instead of shrinking
+            t=-t
+        return t
+
+    lo=longest/2
+    outside=turn(lo, False)<0
+    # Find an upper bound
+    hi=lo*2
+    while turn(hi, outside)>0:
+        hi*=2
+    R=(lo+hi)/2
+    gap=R*abs(turn(R, outside))
+    while gap>tol:
+        if turn(R, outside)>0:
+            lo=R
+        else:
+            hi=R
+        mid=(lo+hi)/2
+        if mid==lo or mid==hi:
+            # Run out of float precision
+            break
+        R=mid
+        gap=R*abs(turn(R, outside))
+
+    # Walk round the circle, then move vertex 0 to the origin and rotate
+    # side 0 onto the x axis
+    angs=prefixSums(centralAngles(R, outside), mode)
+    verts=[(R*math.cos(a), R*math.sin(a)) for a in angs[:-1]]
+    x0,y0=verts[0]
+    x1,y1=verts[1]
+    rot=-math.atan2(y1-y0, x1-x0)
+    c=math.cos(rot)
+    s=math.sin(rot)
+    return [((x-x0)*c-(y-y0)*s, (x-x0)*s+(y-y0)*c) for x,y in verts]
+# End of cyclicPolygon
+
+def closureError(lengths, verts, mode=None):
+    # Worst difference in mm between a side of the polygon and the length it
+    # should be. The closing side picks up the error from the rest of the chain
+    n=len(verts)
+    worst=0
+    for i in range(n):
+        x0,y0=verts[i]
+        x1,y1=verts[(i+1)%n]
+        d=math.sqrt(accumulate([(x1-x0)**2, (y1-y0)**2], mode))
+        worst=max(worst, abs(d-lengths[i]))
+    return worst
+
+def fitScale(verts, size, margin):
+    # Scale and placement to fit the polygon in a w x h image with a margin
+    # all round. Only depends on the polygon and the image size, never the
+    # screen. Here verts have y pointing down, as on the screen. Returns
+    # (scale, origin), where a vertex is drawn at origin+vertex*scale
+    w,h=size
+    xs=[x for x,y in verts]
+    ys=[y for x,y in verts]
+    bw=max(xs)-min(xs)
+    bh=max(ys)-min(ys)
+    scale=min((w-2*margin)/max(bw, 1e-9), (h-2*margin)/max(bh, 1e-9))
+    cx=(max(xs)+min(xs))/2
+    cy=(max(ys)+min(ys))/2
+    return (scale, (w/2-cx*scale, h/2-cy*scale))
@@ -0,0 +1,537 @@
+#!/usr/bin/python
+
+# polyShapes.py - Points, line segments and polygons used by convexPoly.py.
+#
+# Point coordinates are in mm, with y pointing down as on the screen. Each
+# polygon has its own scale (pixels per mm) and origin (where its 0,0 is
+# drawn), so the shape itself does not depend on the size of the screen.
+#
+# A Polygon owns the points and lines for one set of lengths, along with its
+# own scale and solver state. Each polygon is drawn onto its own surface,
+# which is only redrawn when the polygon changes, so a Workspace of many
+# polygons costs one blit per polygon per frame while nothing is moving.
+
+import pygame,math
+from labelCache import formatValue
+from polyGeom import polygonArea, precisionTol
+from rocker import RockerProfile
+
+# Default drawing style. convexPoly.py passes in its own colours and sizes,
+# the label style is only set here
+COLS = [
+(255,255,255),(0,255,0),(0,0,255),(255,255,0),(0,255,255),(192,192,192),
+(128,128,128),(128,0,0),(128,128,0),(0,128,0),(128,0,128),(0,128,128),(0,0,128)
+]
+pointCol=(200,200,200)
+pointRad=10         # Radius for all points
+lineWidth=5         # How wide to draw lines
+lengthCol=(255,255,255)
+angleCol=(0,255,255)
+pointLabelCol=(255,128,0)
+labelOffset=25      # Distance of angle and point labels from their point
+labelPad=80         # Room around a polygon's surface for points and labels
+maxSolveSteps=10000 # Give up auto solving after this many drags
+
+# #################### Classes #################################
+class Point:
+    # Defines a point with a coordinate, colour and label
+    # Fixed is a boolean. If True, the point can not be moved when dragging a line
+    def __init__(self, coord, colour=(255,255,255), label="", fixed=False, rad=pointRad):
+        self.coord=coord
+        self.fixed=fixed
+        self.colour=colour
+        self.label=label
+        self.rad=rad
+        self.lines=[]       # A list of lines connected to this point
+        self.rect=None
+        self.locked=False
+        self.dragOver=False      # Flag if we are currently dragging the mouse over
+        self.poly=None      # Polygon this point belongs to, told when we move
+
+        #print("New point created ", self.coord)
+
+    def move(self, newcoord):
+        if not self.fixed and not self.locked:
+            self.coord=newcoord
+            if self.poly != None:
+                self.poly.changed()
+            # Mark this point as locked - it has moved. If we recurse through a loop
+            # we dont want the other points to pull this one
+            self.locked=True
+            # Do any attached lines have fixed line lengths?
+            for l in self.lines:
+                if l.fixLength:
+                    # This line should not shrink. Find the other point
+                    op=l.otherPoint(self)
+                    # Only move if it is not locked
+                    if op.locked == False:
+                        # Work out new coordinate. Find the direct angle to the other point
+                        # and pull/push it to the correct length along that line
+                        xdiff=op.coord[0]-self.coord[0]
+                        ydiff=op.coord[1]-self.coord[1]
+                        # Avoid division by zero
+                        if xdiff==0:
+                            xdiff=0.000001
+                        ang=math.atan2(ydiff, xdiff)
+                        #print(math.degrees(ang))
+                        # Calculate new x and y offsets
+                        xo=l.length*math.cos(ang)
+                        yo=l.length*math.sin(ang)
+                        # Move other point relative to self
+                        op.move((self.coord[0]+xo, self.coord[1]+yo))
+
+
+            # Done, unlock point
+            self.locked=False
+    # End of move
+
+    def forceMove(self,xoff,yoff):
+        # Forces a move of the point, ignoring all other restraints such as line length
+        # Moves my offset
+        nc=(self.coord[0]+xoff, self.coord[1]+yoff)
+        self.coord=nc
+
+    def draw(self, surface, view=None, offset=(0,0)):
+        # Draw the point on a surface. view converts mm to pixels on the
+        # surface, if None the coordinate is already in pixels. offset is the
+        # screen position of the surface, so rect is in screen coordinates
+        # for clicks
+        if view == None:
+            c=self.coord
+        else:
+            c=view(self.coord)
+        self.rect=pygame.draw.circle(surface, self.colour, c, self.rad).move(offset)
+        # Are we being dragged over?
+        if self.dragOver:
+            pygame.draw.circle(surface, (255,0,255), c, self.rad*2, 1)
+
+    def addLine(self,line):
+        self.lines.append(line)
+
+    def clicked(self, event):
+        if self.rect != None and self.rect.collidepoint(event.pos):
+            return True
+        else:
+            return False
+
+    def setColour(self, col):
+        self.colour=col
+        if self.poly != None:
+            self.poly.dirty=True
+
+    def setDragOver(self, over):
+        if over != self.dragOver:
+            self.dragOver=over
+            if self.poly != None:
+                self.poly.dirty=True
+
+    def whatLines(self):
+        # Debugging function, lists lines connected to this point
+        i=0
+        for l in self.lines:
+            print("Line {}, length {}, fixLength {}".format(i,l.length, l.fixLength))
+            i+=1
+# End of class Point
+
+class LineSegment:
+    # Line segment joining two points A to B
+    # If length is given it is used rather than measured, so a fixed line
+    # keeps exactly the length asked for
+    def __init__(self, A, B, colour=(0,255,0), fixLength=False, w=1, length=None):
+        self.A=A
+        self.B=B
+        self.colour=colour
+        self.fixLength=fixLength    # If true, the line can not be stretched
+        self.width=w
+        self.angleR=0        # Holding values
+        self.angleD=0        # R = radians, D = degrees
+        self.length=0
+        self.recalc()
+        if length != None:
+            self.length=length
+        self.origLength=self.length
+
+        # Register self with the two points
+        A.addLine(self)
+        B.addLine(self)
+
+    def recalc(self):
+        # Recalculate both angle and length
+        xdiff=self.B.coord[0]-self.A.coord[0]
+        ydiff=self.B.coord[1]-self.A.coord[1]
+
+        # Calculate the angle described by the line A-B, relative to the positive x axis.
+        if(xdiff==0):
+            # Avoid division by zero
+            xdiff=0.000001
+        self.angleR=math.atan2(ydiff,xdiff)
+        if(self.angleR<0):
+            self.angleR=2*math.pi + self.angleR
+        self.angleD=math.degrees(self.angleR)
+
+        # Calculate length
+        self.length=math.sqrt(xdiff*xdiff+ydiff*ydiff)
+        #print("Length=", self.length)
+    # End of recalc
+
+    def getAngles(self):
+        # Return a tuple of radians, degrees
+        return (self.angleR, self.angleD)
+
+    def draw(self, surface, view=None):
+        # view converts mm to pixels on the surface, as for Point.draw
+        if view == None:
+            A=self.A.coord
+            B=self.B.coord
+        else:
+            A=view(self.A.coord)
+            B=view(self.B.coord)
+        pygame.draw.line(surface, self.colour, A, B, self.width)
+
+    def otherPoint(self, p):
+        # When we are dragging the end of a line, what is the other point to p?
+        if self.A==p:
+            return self.B
+        else:
+            return self.A
+
+    def replacePoint(self, P, N):
+        # Replace point P with point N
+        if self.A == P:
+            self.A=N
+        elif self.B == P:
+            self.B=N
+# End of class LineSegment
+
+class Polygon:
+    # One set of lengths, given in mm, drawn at its own scale (pixels per mm)
+    # with its 0,0 at screen position origin. Points are plotted in a line
+    # from 0,0. If verts is given, in mm, the points are placed there instead
+    # and joined up into a closed polygon. places sets the precision in mm
+    # the auto solver works to. If clip is given, a pygame.Rect on the
+    # screen, the polygon is only drawn and clicked inside it
+    def __init__(self, lengths, scale, origin, cols=COLS, pCol=pointCol, rad=pointRad, w=lineWidth, verts=None,
+            places=6, clip=None):
+        self.lengths=lengths
+        self.scale=scale
+        self.origin=origin
+        self.tol=precisionTol(places)
+        self.pointCol=pCol
+        self.points=[]
+        self.lines=[]
+        self.dirty=True         # Needs redrawing
+        self.surface=None       # Cached drawing of this polygon
+        self.surfacePos=(0,0)   # Screen position of the cached surface
+        self.profile=None       # Cached rocking profile
+        self.clip=clip          # Screen area the polygon is kept inside
+
+        closed=verts != None
+        if not closed:
+            x=0
+            verts=[(x,0)]
+            for l in lengths:
+                # Work out position for next point
+                x=x+l
+                verts.append((x,0))
+
+        p=self.addPoint(verts[0], "P0", rad)
+        firstPoint=p
+        lastPoint=p
+        c=0     # Track colours
+        for i in range(len(lengths)):
+            if closed and i==len(lengths)-1:
+                # Join back to the first point
+                p=firstPoint
+            else:
+                p=self.addPoint(verts[i+1], "P{}".format(i+1), rad)
+            # Draw line between this and last
+            l=LineSegment(lastPoint, p, colour=cols[c], fixLength=True, w=w, length=lengths[i])
+            self.lines.append(l)
+            c+=1
+            if c>len(cols)-1:
+                c=0
+            lastPoint=p
+    # End of __init__
+
+    def addPoint(self, coord, label, rad):
+        p=Point(coord, colour=self.pointCol, label=label, rad=rad)
+        p.poly=self
+        self.points.append(p)
+        return p
+
+    def toScreen(self, coord):
+        # Convert mm to a screen position
+        return (self.origin[0]+coord[0]*self.scale, self.origin[1]+coord[1]*self.scale)
+
+    def toModel(self, pos):
+        # Convert a screen position to mm
+        return ((pos[0]-self.origin[0])/self.scale, (pos[1]-self.origin[1])/self.scale)
+
+    def changed(self):
+        # The shape has changed, redraw it and forget anything worked out from it
+        self.dirty=True
+        self.profile=None
+
+    def autoClose(self, target):
+        # "Cheat" way to solve. Drag the last point to target (in mm), which
+        # should be away from the first point, then onto the first point and
+        # merge them. May result in a concave shape. Returns how far apart
+        # the two points were when they were merged
+        lastPoint=self.points[-1]
+        lastPoint.move(target)
+        # If we move it directly to where the first point is, the first point is likely to move
+        # We need to loop, until they are closer than the solver precision
+        gap=math.dist(self.points[0].coord, lastPoint.coord)
+        steps=0
+        while gap>self.tol and steps<maxSolveSteps:
+            lastPoint.move(self.points[0].coord)
+            gap=math.dist(self.points[0].coord, lastPoint.coord)
+            steps+=1
+        self.mergePoints(lastPoint, self.points[0])
+        return gap
+
+    def mergePoints(self, A, B):
+        # Replace point B with point A
+        if A == None or B == None or A == B:
+            return
+        if A.poly != self or B.poly != self:
+            # Can only join points in the same polygon
+            return
+        #print("Merging points")
+        for l in B.lines:
+            #print("  Found a line")
+            l.replacePoint(B, A)
+            A.lines.append(l)
+        # Destroy old point
+        self.points.remove(B)
+        self.changed()
+
+    def pan(self, x, y):
+        # Move where the polygon is drawn on screen, in pixels. The shape is
+        # the same so the cached drawing is moved rather than redrawn
+        self.origin=(self.origin[0]+x, self.origin[1]+y)
+        self.surfacePos=(self.surfacePos[0]+x, self.surfacePos[1]+y)
+        for p in self.points:
+            if p.rect != None:
+                p.rect.move_ip(x, y)
+
+    def pointAt(self, event):
+        # Return the point under the mouse, or None
+        if self.clip != None and not self.clip.collidepoint(event.pos):
+            return None
+        for p in self.points:
+            if p.clicked(event):
+                return p
+        return None
+
+    def walk(self):
+        # Walk round a closed polygon from the first point. Returns a list of the
+        # points in order and a list of the lines from each point to the next, or
+        # None if the points do not form a single closed polygon
+        points=self.points
+        if len(points)<3:
+            return None
+        for p in points:
+            if len(p.lines)!=2:
+                return None
+        walk=[points[0]]
+        walkLines=[]
+        l=points[0].lines[0]
+        p=l.otherPoint(points[0])
+        walkLines.append(l)
+        while p!=points[0]:
+            walk.append(p)
+            if p.lines[0]==l:
+                l=p.lines[1]
+            else:
+                l=p.lines[0]
+            walkLines.append(l)
+            p=l.otherPoint(p)
+        if len(walk)!=len(points):
+            return None
+        return (walk, walkLines)
+    # End of walk
+
+    def rockerProfile(self):
+        # Rocking tables for this polygon, worked out once until it changes.
+        # Coordinates are flipped to have y pointing up. Returns None if
+        # the polygon is not closed
+        if self.profile != None:
+            return self.profile
+        walk=self.walk()
+        if walk==None:
+            return None
+        verts=[(p.coord[0], -p.coord[1]) for p in walk[0]]
+        cols=[l.colour for l in walk[1]]
+        self.profile=RockerProfile(verts)
+        # The hull goes anticlockwise. If the points go the other way, the
+        # face from point i runs back towards point i-1, along line i-1
+        if polygonArea(verts)<0:
+            shift=-1
+        else:
+            shift=0
+        self.profile.cols=[cols[i+shift] for i in self.profile.hullIndex]
+        return self.profile
+
+    def render(self, labels=None, font=None, places=1):
+        # Redraw the cached surface if anything has changed. Labels are drawn
+        # if a label cache and font are given
+        if not self.dirty and self.surface != None:
+            return
+        pos=[self.toScreen(p.coord) for p in self.points]
+        xs=[x for x,y in pos]
+        ys=[y for x,y in pos]
+        left=int(min(xs))-labelPad
+        top=int(min(ys))-labelPad
+        w=int(max(xs))+labelPad-left
+        h=int(max(ys))+labelPad-top
+        self.surface=pygame.Surface((w,h), pygame.SRCALPHA)
+        self.surfacePos=(left,top)
+        def view(coord):
+            x,y=self.toScreen(coord)
+            return (x-left, y-top)
+        for l in self.lines:
+            l.draw(self.surface, view)
+        for p in self.points:
+            p.draw(self.surface, view, self.surfacePos)
+        if labels != None and font != None:
+            self.drawLabels(self.surface, self.surfacePos, labels, font, places)
+        self.dirty=False
+    # End of render
+
+    def draw(self, surface, labels=None, font=None, places=1):
+        self.render(labels, font, places)
+        if self.clip == None:
+            surface.blit(self.surface, self.surfacePos)
+            return
+        oldClip=surface.get_clip()
+        surface.set_clip(self.clip)
+        surface.blit(self.surface, self.surfacePos)
+        surface.set_clip(oldClip)
+
+    def drawLabels(self, surface, offset, labels, font, places):
+        # Label segment lengths (in mm), interior angles and point labels.
+        # Text surfaces come from the label cache, so an unchanged label is only a blit
+        for txt,col,pos in self.labelList(places):
+            pos=(pos[0]-offset[0], pos[1]-offset[1])
+            labels.blit(surface, txt, font, col, pos, centre=True)
+
+    def labelList(self, places):
+        # Returns a list of (text, colour, centre) for every label, with the
+        # centre in screen coordinates
+        rtn=[]
+        for l in self.lines:
+            mid=self.toScreen(((l.A.coord[0]+l.B.coord[0])/2, (l.A.coord[1]+l.B.coord[1])/2))
+            rtn.append((formatValue(l.length, places), lengthCol, mid))
+
+        if len(self.points)>0:
+            # Push angle and point labels away from the middle of the shape
+            cx=sum(p.coord[0] for p in self.points)/len(self.points)
+            cy=sum(p.coord[1] for p in self.points)/len(self.points)
+        # Which way round a closed polygon goes, to tell interior angles
+        # from reflex ones
+        prevPoint={}
+        area=0
+        walk=self.walk()
+        if walk != None:
+            area=polygonArea([p.coord for p in walk[0]])
+            for i in range(len(walk[0])):
+                prevPoint[walk[0][i]]=walk[0][i-1]
+        for p in self.points:
+            xdiff=p.coord[0]-cx
+            ydiff=p.coord[1]-cy
+            d=math.sqrt(xdiff*xdiff+ydiff*ydiff)
+            if d==0:
+                d=1
+            ux=xdiff/d
+            uy=ydiff/d
+            x,y=self.toScreen(p.coord)
+            if p.label!="":
+                pos=(x+ux*labelOffset*2, y+uy*labelOffset*2)
+                rtn.append((p.label, pointLabelCol, pos))
+            ang=vertexAngle(p, prevPoint.get(p), area)
+            if ang!=None:
+                # Angle goes on the inside of the shape
+                pos=(x-ux*labelOffset*2, y-uy*labelOffset*2)
+                rtn.append((formatValue(ang[1], places, "°"), angleCol, pos))
+        return rtn
+    # End of labelList
+# End of class Polygon
+
+class Workspace:
+    # Holds many polygons side by side. Each keeps its own scale, points and
+    # solver state, and only polygons which have changed are redrawn
+    def __init__(self):
+        self.polygons=[]
+        self.selected=None      # Polygon last clicked on
+        self.showLabels=True
+        self.labels=None
+        self.font=None
+        self.places=1
+
+    def add(self, poly):
+        self.polygons.append(poly)
+        if self.selected == None:
+            self.selected=poly
+        return poly
+
+    def pointAt(self, event):
+        # Return a tuple of (polygon, point) under the mouse, or None.
+        # Polygons drawn last are on top so are checked first
+        for poly in reversed(self.polygons):
+            p=poly.pointAt(event)
+            if p != None:
+                return (poly, p)
+        return None
+
+    def pan(self, x, y):
+        if x==0 and y==0:
+            return
+        for poly in self.polygons:
+            poly.pan(x,y)
+
+    def redrawAll(self):
+        # Force every polygon to redraw, e.g. when labels are switched on or off
+        for poly in self.polygons:
+            poly.dirty=True
+
+    def draw(self, surface):
+        if self.showLabels:
+            labels=self.labels
+        else:
+            labels=None
+        for poly in self.polygons:
+            poly.draw(surface, labels, self.font, self.places)
+# End of class Workspace
+
+# ********* Functions ************
+
+def vertexAngle(p, prev=None, area=0):
+    # Angle at point p between its two lines as a tuple (radians, degrees).
+    # On a closed polygon, give the point before p and the signed area of
+    # the polygon (see polyGeom.polygonArea) to get the interior angle, which
+    # may be over 180 degrees. Otherwise this is the smaller angle between
+    # the lines. Returns None if p is not joined to exactly two lines, e.g.
+    # the ends of an open chain
+    if len(p.lines)!=2:
+        return None
+    A=p.lines[0].otherPoint(p)
+    B=p.lines[1].otherPoint(p)
+    if prev == B:
+        A,B=B,A
+    ax=A.coord[0]-p.coord[0]
+    ay=A.coord[1]-p.coord[1]
+    bx=B.coord[0]-p.coord[0]
+    by=B.coord[1]-p.coord[1]
+    cross=ax*by-ay*bx
+    dot=ax*bx+ay*by
+    if prev == None or area == 0:
+        angR=math.atan2(abs(cross), dot)
+    else:
+        # Turning from the next line back to the previous one, the same way
+        # round as the polygon, sweeps the inside
+        if area>0:
+            cross=-cross
+        angR=math.atan2(cross, dot)%(2*math.pi)
+    return (angR, math.degrees(angR))
+# End of vertexAngle
@@ -0,0 +1,150 @@
+#!/usr/bin/python
+
+# render.py - Draw polygons straight to PNG or SVG files, without a window.
+#
+# Each design is the cyclic polygon for its lengths (see polyGeom.py), solved
+# to the precision shown on the labels and drawn with the same Point and
+# LineSegment styling as convexPoly.py. The scale is fitted to the image size
+# rather than the desktop, so the same lengths always give the same picture.
+# PNGs are drawn on an offscreen pygame surface, SVGs are written as plain
+# text. Many designs are shared out over a pool of processes.
+#
+#   python render.py out 70.7 67.0 63.4 60.1 57.0
+#   python render.py --svg --size 1200x800 out designs.txt
+#   python render.py --sum-mode fraction out designs.txt
+#
+# Designs are given as in rocker.py. Files are named design0000.png etc.
+
+import os,sys,argparse
+from multiprocessing import Pool
+import pygame
+from labelCache import LabelCache
+from polyGeom import cyclicPolygon, fitScale
+from polyShapes import Polygon, COLS, pointCol, pointRad, lineWidth
+from rocker import readDesigns
+
+renderSize=(800,800)    # Image size in pixels
+renderMarg=100          # Room round the polygon for points and labels
+labelPlaces=1           # Decimal places for lengths and angles on labels, also
+                        # the precision in mm the polygon is solved to
+labelSize=14            # Font size for labels
+BG = (0,0,0)
+
+# Per process, so each worker makes its own font and label cache
+font=None
+labels=LabelCache()
+
+# ********* Functions ************
+
+def layout(lengths, size=renderSize, places=labelPlaces, mode=None):
+    # Polygon for a design fitted into an image of this size. The polygon
+    # is flipped to have y pointing down like the image. mode is the sum
+    # mode, see polyGeom.accumulate
+    verts=[(x,-y) for x,y in cyclicPolygon(lengths, places, mode)]
+    scale,origin=fitScale(verts, size, renderMarg)
+    return Polygon(lengths, scale, origin, cols=COLS, pCol=pointCol, rad=pointRad, w=lineWidth,
+        verts=verts, places=places)
+
+def getFont():
+    global font
+    if font == None:
+        pygame.font.init()
+        font=pygame.font.Font('freesansbold.ttf', labelSize)
+    return font
+
+def renderPNG(lengths, path, size=renderSize, showLabels=True, places=labelPlaces, mode=None):
+    poly=layout(lengths, size, places, mode)
+    surface=pygame.Surface(size)
+    surface.fill(BG)
+    for l in poly.lines:
+        l.draw(surface, poly.toScreen)
+    for p in poly.points:
+        p.draw(surface, poly.toScreen)
+    if showLabels:
+        poly.drawLabels(surface, (0,0), labels, getFont(), places)
+    pygame.image.save(surface, path)
+
+def svgCol(col):
+    return "rgb({},{},{})".format(*col)
+
+def renderSVG(lengths, path, size=renderSize, showLabels=True, places=labelPlaces, mode=None):
+    # Same picture as renderPNG, written by hand so no display or image
+    # library is needed
+    poly=layout(lengths, size, places, mode)
+    out=[]
+    out.append('<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" viewBox="0 0 {} {}">'.format(
+        size[0], size[1], size[0], size[1]))
+    out.append('<rect width="100%" height="100%" fill="{}"/>'.format(svgCol(BG)))
+    for l in poly.lines:
+        A=poly.toScreen(l.A.coord)
+        B=poly.toScreen(l.B.coord)
+        out.append('<line x1="{:.3f}" y1="{:.3f}" x2="{:.3f}" y2="{:.3f}" stroke="{}" stroke-width="{}"/>'.format(
+            A[0], A[1], B[0], B[1], svgCol(l.colour), l.width))
+    for p in poly.points:
+        c=poly.toScreen(p.coord)
+        out.append('<circle cx="{:.3f}" cy="{:.3f}" r="{}" fill="{}"/>'.format(
+            c[0], c[1], p.rad, svgCol(p.colour)))
+    if showLabels:
+        for txt,col,pos in poly.labelList(places):
+            out.append('<text x="{:.3f}" y="{:.3f}" fill="{}" font-family="FreeSans, sans-serif" font-weight="bold" '
+                'font-size="{}" text-anchor="middle" dominant-baseline="central">{}</text>'.format(
+                pos[0], pos[1], svgCol(col), labelSize, txt))
+    out.append('</svg>')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out)+"\n")
+
+def renderOne(job):
+    # Render one design, returns (path, error). Run in the worker processes,
+    # so everything it needs comes in the job rather than module settings
+    lengths,path,size,showLabels,places,mode=job
+    try:
+        if path.endswith(".svg"):
+            renderSVG(lengths, path, size, showLabels, places, mode)
+        else:
+            renderPNG(lengths, path, size, showLabels, places, mode)
+    except ValueError as e:
+        return (path, str(e))
+    return (path, None)
+
+def renderBatch(designs, outDir, fmt="png", size=renderSize, showLabels=True, processes=None, places=labelPlaces,
+        mode=None):
+    # Render a list of designs into outDir over a pool of processes. Returns
+    # a list of (path, error) in the same order as designs
+    os.makedirs(outDir, exist_ok=True)
+    jobs=[(d, os.path.join(outDir, "design{:04d}.{}".format(i, fmt)), size, showLabels, places, mode)
+        for i,d in enumerate(designs)]
+    if len(jobs)<2 or processes==1:
+        return [renderOne(j) for j in jobs]
+    with Pool(processes) as pool:
+        return pool.map(renderOne, jobs, chunksize=max(1, len(jobs)//(8*(processes or os.cpu_count() or 1))))
+# ********* End of functions *****
+
+
+if __name__ == "__main__":
+    parser=argparse.ArgumentParser(description="Render polygons to PNG or SVG files")
+    parser.add_argument("outDir", help="Directory to write images to")
+    parser.add_argument("designs", nargs="+", help="Lengths in mm, or files with one design per line")
+    parser.add_argument("--svg", action="store_true", help="Write SVG instead of PNG")
+    parser.add_argument("--size", default="{}x{}".format(*renderSize), help="Image size, e.g. 800x800")
+    parser.add_argument("--no-labels", action="store_true", help="Leave off lengths, angles and point labels")
+    parser.add_argument("--places", type=int, default=labelPlaces, help="Decimal places of a mm to solve and label to")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--sum-mode", choices=["float","fsum","fraction","decimal"], default=None,
+        help="How to add up angles round the polygon when solving it")
+    args=parser.parse_args()
+
+    size=tuple(int(x) for x in args.size.split("x"))
+    if args.svg:
+        fmt="svg"
+    else:
+        fmt="png"
+    results=renderBatch(readDesigns(args.designs), args.outDir, fmt, size, not args.no_labels, args.processes,
+        args.places, args.sum_mode)
+    errors=0
+    for path,err in results:
+        if err != None:
+            print("{}: {}".format(path, err))
+            errors+=1
+    print("Rendered {} of {} designs to {}".format(len(results)-errors, len(results), args.outDir))
+    if errors>0:
+        sys.exit(1)
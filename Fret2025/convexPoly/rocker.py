@@ -0,0 +1,215 @@
+#!/usr/bin/python
+
+# rocker.py - Rolls a closed polygon over a flat surface, as a fret rocker is
+# rocked across the frets.
+#
+# All of the geometry is worked out once when a RockerProfile is made: the
+# pivot for each face, the angle it rolls through, where it touches the
+# ground and the centroid height sampled through each roll. Animation and
+# analysis then only look values up in these tables, so they cost the same
+# at any frame rate.
+#
+# Run on its own it works headless, printing rocking metrics for one or more
+# designs. Lengths are in mm, either on the command line or in a file with
+# one design per line, lengths separated by commas:
+#
+#   python rocker.py 70.7 67.0 63.4 60.1 57.0
+#   python rocker.py designs.txt
+#   python rocker.py --sum-mode fraction designs.txt
+
+import math,argparse
+from polyGeom import polygonArea, polygonCentroid, cyclicPolygon, convexHull, prefixSums
+
+rockSteps=90        # Samples of centroid height through the roll off each face
+
+
+# #################### Classes #################################
+class RockerProfile:
+    # Contact profile of a polygon rolling to the right along the x axis.
+    # verts is a list of (x,y) vertices in order, with y pointing up.
+    #
+    # A real rocker only touches the ground on its convex hull, so the
+    # tables are built from the hull. Reflex vertices, and vertices in line
+    # with their neighbours, never touch and are skipped. hullIndex gives the
+    # index in verts of each hull vertex. Face i is the side from hull vertex
+    # i to hull vertex i+1, and face 0 starts on the ground with hull vertex
+    # 0 at x=0. The centroid is still that of the whole polygon, as the
+    # plate's weight is where it is whatever it rolls on. mode is the sum
+    # mode for the ground positions, see polyGeom.accumulate
+    def __init__(self, verts, steps=rockSteps, mode=None):
+        verts=list(verts)
+        self.hullIndex=convexHull(verts)
+        if len(self.hullIndex)<3 or polygonArea(verts)==0:
+            raise ValueError("Polygon has no area to rock on")
+        self.centroid=polygonCentroid(verts)
+        # The hull is anticlockwise, so the shape sits above its face
+        verts=[verts[i] for i in self.hullIndex]
+        n=len(verts)
+        self.n=n
+        self.steps=steps
+        self.verts=verts
+
+        faceVec=[(verts[(i+1)%n][0]-verts[i][0], verts[(i+1)%n][1]-verts[i][1]) for i in range(n)]
+        self.faceLength=[math.hypot(x,y) for x,y in faceVec]
+        faceAng=[math.atan2(y,x) for x,y in faceVec]
+
+        # Rolling off face i pivots about vertex i+1 until face i+1 is on the
+        # ground, turning through the exterior angle at that vertex
+        self.pivot=[(i+1)%n for i in range(n)]
+        self.rollAngle=[(faceAng[(i+1)%n]-faceAng[i])%(2*math.pi) for i in range(n)]
+        # Ground position of each pivot
+        self.pivotX=prefixSums(self.faceLength, mode)[1:]
+        self.perimeter=self.pivotX[-1]
+
+        # Vertices relative to the pivot with face i flat on the ground
+        self.restVerts=[]
+        for i in range(n):
+            c=math.cos(-faceAng[i])
+            s=math.sin(-faceAng[i])
+            px,py=verts[self.pivot[i]]
+            self.restVerts.append([((x-px)*c-(y-py)*s, (x-px)*s+(y-py)*c) for x,y in verts])
+        # Centroid relative to the pivot at rest on each face
+        cRest=[]
+        for i in range(n):
+            c=math.cos(-faceAng[i])
+            s=math.sin(-faceAng[i])
+            px,py=verts[self.pivot[i]]
+            dx=self.centroid[0]-px
+            dy=self.centroid[1]-py
+            cRest.append((dx*c-dy*s, dx*s+dy*c))
+        self.faceHeight=[y for x,y in cRest]
+
+        # Centroid offset from the pivot through each roll. Rolling right is
+        # a clockwise turn, so points are rotated by -angle
+        self.heightTable=[]
+        self.shiftTable=[]
+        for i in range(n):
+            dx,dy=cRest[i]
+            angs=[self.rollAngle[i]*k/steps for k in range(steps+1)]
+            self.heightTable.append([dy*math.cos(a)-dx*math.sin(a) for a in angs])
+            self.shiftTable.append([dx*math.cos(a)+dy*math.sin(a) for a in angs])
+    # End of __init__
+
+    def pose(self, t):
+        # t counts faces rolled, e.g. 2.5 is half way through the roll off
+        # face 2. Returns a tuple of face, angle rolled and position along the
+        # table for that face
+        face=int(math.floor(t))%self.n
+        frac=t-math.floor(t)
+        return (face, frac*self.rollAngle[face], frac*self.steps)
+
+    def lookup(self, table, t):
+        # Interpolate a per-face table at t
+        face,ang,pos=self.pose(t)
+        k=min(int(pos), self.steps-1)
+        f=pos-k
+        row=table[face]
+        return row[k]+(row[k+1]-row[k])*f
+
+    def pivotAt(self, t):
+        # Ground x of the pivot in use at t, continuing past a full lap
+        face=int(math.floor(t))%self.n
+        laps=math.floor(t/self.n)
+        return self.pivotX[face]+laps*self.perimeter
+
+    def centroidAt(self, t):
+        # (x, height) of the centroid at t
+        return (self.pivotAt(t)+self.lookup(self.shiftTable, t), self.lookup(self.heightTable, t))
+
+    def vertsAt(self, t):
+        # Vertex positions at t, for drawing
+        face,ang,pos=self.pose(t)
+        px=self.pivotAt(t)
+        c=math.cos(ang)
+        s=math.sin(ang)
+        return [(px+x*c+y*s, y*c-x*s) for x,y in self.restVerts[face]]
+
+    def advance(self, t, angle):
+        # Roll on by an angle in radians from t and return the new t. Rolling
+        # at a steady angular speed spends longer on faces with larger angles
+        while angle>0:
+            face,ang,pos=self.pose(t)
+            left=self.rollAngle[face]-ang
+            if angle<left:
+                return t+angle/self.rollAngle[face]
+            angle-=left
+            t=math.floor(t)+1
+        return t
+
+    def metrics(self):
+        # Rocking metrics from the height tables as a dictionary. Samples are
+        # weighted by the angle they cover, so the mean and variance are per
+        # unit of rolling rather than per face
+        tw=0
+        th=0
+        th2=0
+        maxLift=0
+        for i in range(self.n):
+            w=self.rollAngle[i]/self.steps
+            row=self.heightTable[i]
+            for k in range(self.steps):
+                # Trapezium rule between samples
+                h=(row[k]+row[k+1])/2
+                tw+=w
+                th+=h*w
+                th2+=h*h*w
+            lift=max(row)-self.faceHeight[i]
+            if lift>maxLift:
+                maxLift=lift
+        mean=th/tw
+        allH=[h for row in self.heightTable for h in row]
+        return {
+            "faces": self.n,
+            "perimeter": self.perimeter,
+            "meanHeight": mean,
+            "heightVariance": max(0, th2/tw-mean*mean),
+            "minHeight": min(allH),
+            "maxHeight": max(allH),
+            "maxLift": maxLift
+        }
+# End of class RockerProfile
+
+
+# ********* Functions ************
+
+def profileFromLengths(lengths, steps=rockSteps, mode=None):
+    # Rocker profile of the cyclic polygon with these side lengths
+    return RockerProfile(cyclicPolygon(lengths, mode=mode), steps, mode)
+
+def readDesigns(args):
+    # Designs from the command line, either lengths or files of lengths
+    designs=[]
+    nums=[]
+    for a in args:
+        try:
+            nums.append(float(a))
+        except ValueError:
+            with open(a) as f:
+                for line in f:
+                    line=line.split("#")[0].strip()
+                    if line!="":
+                        designs.append([float(x) for x in line.split(",")])
+    if len(nums)>0:
+        designs.insert(0, nums)
+    return designs
+
+def printMetrics(designs, mode=None):
+    print("design,faces,perimeter,meanHeight,heightVariance,minHeight,maxHeight,maxLift")
+    for d,lengths in enumerate(designs):
+        try:
+            m=profileFromLengths(lengths, mode=mode).metrics()
+        except ValueError as e:
+            print("{},error: {}".format(d, e))
+            continue
+        print("{},{},{:.3f},{:.3f},{:.5f},{:.3f},{:.3f},{:.3f}".format(d, m["faces"], m["perimeter"],
+            m["meanHeight"], m["heightVariance"], m["minHeight"], m["maxHeight"], m["maxLift"]))
+# ********* End of functions *****
+
+
+if __name__ == "__main__":
+    parser=argparse.ArgumentParser(description="Print rocking metrics for polygons")
+    parser.add_argument("designs", nargs="+", help="Lengths in mm, or files with one design per line")
+    parser.add_argument("--sum-mode", choices=["float","fsum","fraction","decimal"], default=None,
+        help="How to add up angles and lengths round the polygon")
+    args=parser.parse_args()
+    printMetrics(readDesigns(args.designs), args.sum_mode)